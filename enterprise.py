@@ -3,7 +3,6 @@
 
 from glidertrace import *
 import os
-import glob
 import matplotlib.pyplot as plt
 import matplotlib.lines as mlines
 import numpy as np
@@ -20,23 +19,21 @@ def plotonmap(lgdir, title, imagefile, turnpointlist=None, plot_extras=None,
               labels_use=None, zoom=9):
     recordfile = lgdir+'/records.txt'
 
-    files = glob.glob(lgdir+'/*.igc') + glob.glob(lgdir+'/*.IGC')
+    files = iter_igc(lgdir)
 
     # Get logger header records
     if os.path.isfile(recordfile):
         records = read_header_records(recordfile)
-        files_new = list(set(files) - set([record.get('logger_file') for
-                         record in records]))
-        if len(files_new) > 0:
-            write_header_records(files_new, recordfile, append=True)
-            editor = os.getenv('EDITOR', 'gedit')
-            x = os.spawnlp(os.P_WAIT, editor, editor, recordfile)
-            records = read_header_records(recordfile)
+        have = {record['logger_file']: record for record in records}
+        files_new = (lgfile for lgfile in files if lgfile not in have)
+        records_new = write_header_records(files_new, recordfile,
+                                           append=True)
+        if records_new:
+            records += records_new
+            records = edit_header_records(recordfile, records)
     else:
-        write_header_records(files, recordfile)
-        editor = os.getenv('EDITOR', 'gedit')
-        x = os.spawnlp(os.P_WAIT, editor, editor, recordfile)
-        records = read_header_records(recordfile)
+        records = edit_header_records(
+            recordfile, write_header_records(files, recordfile))
 
     files = [record.get('logger_file') for record in records]
     comp_nos = [record.get('compno') for record in records]
@@ -48,19 +45,14 @@ def plotonmap(lgdir, title, imagefile, turnpointlist=None, plot_extras=None,
     files = list(file_dict.values())
 
     # Choose colours for exceptional flights
-    colors = []
     cmap = plt.get_cmap('gist_rainbow')
-    for i, pilot in enumerate(labels_use):
-        colors.append(cmap(float(i)/(len(labels_use)-1)))
+    colors = list(cmap(np.linspace(0.0, 1.0, len(labels_use))))
 
     # Choose colours for other flights
     fixed_colors = ['DarkRed'] * len(files)
 
     # Read traces from files
-    flights = []
-    for lgfile in labelled_files + files:
-        flight = GliderFlight(lgfile, skip_declaration=True)
-        flights.append(flight)
+    flights = read_flights(labelled_files + files, skip_declaration=True)
 
     # Plot traces
     ax1 = plotmap(flights[::-1], zoom=zoom,
@@ -70,13 +62,11 @@ def plotonmap(lgdir, title, imagefile, turnpointlist=None, plot_extras=None,
     # Plot turnpoints if given
     if turnpointlist is not None:
         dummy = Task(turnpointlist)
-        source_crs = ccrs.PlateCarree()
-        target_crs = ax1.projection
-        for name, coord in dummy.latlon.items():
-            ax1.annotate(
-                name,
-                xy=target_crs.transform_point(coord[0], coord[1], source_crs),
-                bbox=dict(boxstyle="round", fc="w"), fontsize='small')
+        lon, lat = dummy.lonlat()
+        points = ax1.projection.transform_points(SOURCE_CRS, lon, lat)
+        for name, (x, y, _) in zip(dummy.latlon, points):
+            ax1.annotate(name, xy=(x, y), bbox=dict(boxstyle="round", fc="w"),
+                         fontsize='small')
 
     # Any extra stuff
     if plot_extras is not None:
@@ -91,12 +81,13 @@ def plotonmap(lgdir, title, imagefile, turnpointlist=None, plot_extras=None,
     for legobj in leg.legendHandles:
         legobj.set_linewidth(2.0)
 
-    # Save to file
+    # Save to file, with fixed margins in place of tight_layout's extra
+    # layout pass.
     fig = plt.gcf()
-    fig.tight_layout()
     fig.set_size_inches((11.7, 8.3))
-    plt.savefig(imagefile + '.pdf')
-    plt.savefig(imagefile + '.png')
+    fig.subplots_adjust(left=0.02, right=0.98, bottom=0.02, top=0.95)
+    fig.savefig(imagefile + '.png')
+    fig.savefig(imagefile + '.pdf')
 
     plt.close()
 
@@ -104,13 +95,17 @@ def plotonmap(lgdir, title, imagefile, turnpointlist=None, plot_extras=None,
 def plot_range_rings():
     ax = plt.gca()
     color = 'Gray'
-    for distance in range(10, 181, 10):
+    distances = np.arange(10, 181, 10)
+    for distance in distances:
         ax.add_patch(mpatches.Circle(DSGC_OS, distance * 1000, edgecolor=color,
                      facecolor='none', transform=OS_CRS))
+
+    # Labels are projected in a single call with the shared transformer.
+    xs, ys = get_transformer(OS_CRS, ax.projection).transform(
+        DSGC_OS[0] + distances * 820 + 1500, DSGC_OS[1] + distances * 570)
+    for distance, x, y in zip(distances, xs, ys):
         ax.annotate('%skm' % distance,
-                    xy=ax.projection.transform_point(
-                        DSGC_OS[0]+distance*820 + 1500,
-                        DSGC_OS[1]+distance*570, OS_CRS),
+                    xy=(x, y),
                     color=color,
                     fontsize='small',
                     ha='left', va='top')
@@ -1,29 +1,49 @@
 """Classes and functions for plotting glider traces."""
 
 import datetime
+import functools
 import math
-import os.path
-from itertools import islice
+import os
+import pickle
+import re
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.request import HTTPError, Request, URLError, urlopen
 
 import shapely.geometry as sgeom
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
+import matplotlib.collections as mcollections
 import matplotlib.dates as mdates
 import matplotlib.gridspec as gridspec
 import matplotlib.patches as mpatches
 import cartopy.crs as ccrs
 from cartopy.io.img_tiles import MapboxTiles, OSM, GoogleTiles
+from pyproj import Transformer
+from PIL import Image
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 from mapbox import mapboxkey
 
 TURNPOINT_FILE = 'bga_tp_2015.txt'
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'gliding')
+TURNPOINT_CACHE = os.path.join(CACHE_DIR, 'tp.pkl')
+TILE_CACHE = os.path.join(CACHE_DIR, 'tiles')
 METRETOFOOT = 3.28
+B_RECORD_LENGTH = 35  # Fixed part of a B record, excluding any extensions
 SOURCE_CRS = ccrs.PlateCarree()
 GEOM_CRS = ccrs.OSGB()
 
 HEADER_KEYS = ['pilot', 'type', 'reg', 'compno', 'date']
 HEADER_FLAGS = ['HFPLT', 'HFGTY', 'HFGID', 'HFCID',  'HFDTE']
+HEADKEY_DICT = dict(zip(HEADER_FLAGS, HEADER_KEYS))
+PILOT_SEPARATORS = re.compile(r'[._]')
 
 # Restore old matplotlib defaults.
 matplotlib.rcParams['figure.figsize'] = [8.0, 6.0]
@@ -35,40 +55,168 @@ matplotlib.rcParams['legend.fontsize'] = 'large'
 matplotlib.rcParams['figure.titlesize'] = 'medium'
 
 
+class CachedTiles(object):
+    '''
+    Mixin for cartopy web tile sources that keeps every downloaded tile as a
+    PNG file under TILE_CACHE, so each tile is only fetched once.  Failed
+    downloads are not cached.
+    '''
+    def get_image(self, tile):
+        x, y, z = tile
+        tile_form = self.desired_tile_form or 'RGB'
+        tile_file = os.path.join(TILE_CACHE, type(self).__name__, self.style,
+                                 '{}_{}_{}.png'.format(z, x, y))
+        if not os.path.isfile(tile_file):
+            request = Request(self._image_url(tile),
+                              headers={'User-Agent': self.user_agent})
+            try:
+                with urlopen(request) as fh:
+                    im_data = fh.read()
+            except (HTTPError, URLError) as err:
+                print(err)
+                img = Image.new(tile_form, (256, 256), (250, 250, 250))
+                return img, self.tileextent(tile), 'lower'
+            # Write to a temporary file and move it into place, so that an
+            # interrupted run never leaves a truncated tile in the cache.
+            os.makedirs(os.path.dirname(tile_file), exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                    dir=os.path.dirname(tile_file), delete=False) as ofp:
+                ofp.write(im_data)
+            os.replace(ofp.name, tile_file)
+
+        img = Image.open(tile_file).convert(tile_form)
+        return img, self.tileextent(tile), 'lower'
+
+
+class CachedMapboxTiles(CachedTiles, MapboxTiles):
+    pass
+
+
+class CachedGoogleTiles(CachedTiles, GoogleTiles):
+    pass
+
+
+@functools.lru_cache()
+def get_tiler(terrain=False):
+    '''
+    Get the map tile source.  Created once and shared by every map plotted.
+    '''
+    if terrain:
+        return CachedGoogleTiles(style='terrain')
+    else:
+        return CachedMapboxTiles(mapboxkey, 'pirates')
+
+
+@functools.lru_cache()
+def get_transformer(source_crs, target_crs):
+    '''
+    Get a pyproj Transformer between two coordinate reference systems.  Built
+    once per pair and reused.
+    '''
+    return Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
+
 class Trace(object):
     '''
     Class to hold glider trace (B record) info.  Attribute of GliderTrace.
     Initialised empty and then populated as file is read.
     '''
     def __init__(self):
-        self.times = []
-        self.alt = []
-        self.gpsalt = []
-        self.latlon = sgeom.LineString()
+        self.times = np.empty(0, dtype=int)  # Seconds since midnight
+        self.mpl_dates = np.empty(0)  # Matplotlib date numbers
+        self.alt = np.empty(0)
+        self.gpsalt = np.empty(0)
+        self._lon = np.empty(0)
+        self._lat = np.empty(0)
+        self._clear_caches()
+
+    def _clear_caches(self):
+        """Forget everything derived from the coordinates."""
+        self._os_cache = None
+        self._simplified_cache = {}
+        self._latlon_line = None
+
+    @property
+    def lon(self):
+        return self._lon
+
+    @lon.setter
+    def lon(self, value):
+        self._lon = value
+        self._clear_caches()
+
+    @property
+    def lat(self):
+        return self._lat
+
+    @lat.setter
+    def lat(self, value):
+        self._lat = value
+        self._clear_caches()
+
+    @property
+    def latlon(self):
+        """
+        Get the trace as a shapely LineString of (lon, lat) points.  Only
+        built when first needed, then cached until the coordinates change.
+        """
+        if self._latlon_line is None:
+            self._latlon_line = sgeom.LineString(
+                np.column_stack([self.lon, self.lat]))
+        return self._latlon_line
+
+    def map_points(self, tolerance=None):
+        """
+        Get longitudes and latitudes for plotting: simplified if a tolerance in
+        metres is given.
+        """
+        if tolerance:
+            return self.simplified(tolerance)
+        return self.lon, self.lat
 
-    def addtomap(self, ax, color='black'):
-        lon, lat = zip(*self.latlon.coords)
+    def addtomap(self, ax, color='black', tolerance=None):
+        lon, lat = self.map_points(tolerance)
         plt.plot(lon, lat, transform=SOURCE_CRS, color=color)
 
     def os_points(self):
         """
-        Get eastings and northings as numpy arrays.
+        Get eastings and northings as numpy arrays.  Calculated on first call
+        and then cached until the trace coordinates change.
         """
-        lon, lat = np.array(self.latlon).T
-        return GEOM_CRS.transform_points(SOURCE_CRS, lon, lat)[:, :-1]
+        if self._os_cache is None:
+            self._os_cache = GEOM_CRS.transform_points(
+                SOURCE_CRS, self.lon, self.lat)[:, :2]
+        return self._os_cache
+
+    def simplified(self, tolerance=50):
+        """
+        Get longitudes and latitudes of the points kept when the trace is
+        simplified with the Douglas-Peucker algorithm on OSGB coordinates, so
+        that the line moves by no more than tolerance metres.  The points kept
+        are cached for each tolerance.
+        """
+        if tolerance not in self._simplified_cache:
+            points = self.os_points()
+            keep = slice(None)
+            if len(points) > 2:
+                kept = np.array(sgeom.LineString(points).simplify(
+                    tolerance, preserve_topology=False).coords)
+                # Simplification keeps original vertices, so match them back.
+                keep = np.isin(points @ [1, 1j], kept @ [1, 1j])
+            self._simplified_cache[tolerance] = keep
+        keep = self._simplified_cache[tolerance]
+        return self.lon[keep], self.lat[keep]
 
     def distance(self):
         """
         Return the actual distance flown in km.
         """
-        os_shape = sgeom.LineString(self.os_points())
-        return os_shape.length / 1000.0
+        eastings, northings = self.os_points().T
+        return np.hypot(np.diff(eastings), np.diff(northings)).sum() / 1000.0
 
     def check_points(self):
         eastings, northings = self.os_points().T
-        distances = np.sqrt((eastings[1:] - eastings[:-1]) ** 2 +
-                            (northings[1:] - northings[:-1]) ** 2)
-        if distances.max() > 2000:
+        if np.hypot(np.diff(eastings), np.diff(northings)).max() > 2000:
             raise UserWarning("Probable data error.  Over 2km in one step.")
 
 
@@ -99,55 +247,66 @@ class Task(object):
         # need order.
 
         if barrels:
-            for name in self.names:
-                lon, lat = self.latlon[name]
-                self.geoms.append(sgeom.Point(GEOM_CRS.transform_point(
-                    lon, lat, SOURCE_CRS)).buffer(500))
+            lon, lat = self.lonlat(self.names)
+            for x, y, _ in GEOM_CRS.transform_points(SOURCE_CRS, lon, lat):
+                self.geoms.append(sgeom.Point(x, y).buffer(500))
         else:
             pass
 
+    def lonlat(self, names=None):
+        '''
+        Get the longitudes and latitudes of the named turnpoints, or of all
+        located turnpoints, as two arrays.  Both are empty if there are none.
+        '''
+        if names is None:
+            coords = list(self.latlon.values())
+        else:
+            coords = [self.latlon[name] for name in names]
+        return np.array(coords, dtype=float).reshape(-1, 2).T
+
     def addtomap(self, ax, color=None):
         if len(self.names):
+            names = list(self.latlon)
+            lon, lat = self.lonlat()
             if len(self.geoms):
                 ax.add_geometries(self.geoms, GEOM_CRS, facecolor='w',
                                   alpha=0.5)
-                for lon, lat in self.latlon.values():
+                for x, y, _ in GEOM_CRS.transform_points(SOURCE_CRS, lon, lat):
                     circle = mpatches.Circle(
-                        GEOM_CRS.transform_point(lon, lat, SOURCE_CRS), 50,
-                        edgecolor='MidnightBlue', facecolor='none',
-                        transform=GEOM_CRS)
+                        (x, y), 50, edgecolor='MidnightBlue',
+                        facecolor='none', transform=GEOM_CRS)
                     ax.add_patch(circle)
 
             task_lon, task_lat = zip(*[self.latlon.get(tp) for
                                      tp in self.names])
             ax.plot(task_lon, task_lat, transform=SOURCE_CRS, color=color)
-            for name, coord in self.latlon.items():
+            points = ax.projection.transform_points(SOURCE_CRS, lon, lat)
+            for name, (x, y, _) in zip(names, points):
                 ax.annotate(
-                    name,
-                    xy=ax.projection.transform_point(coord[0], coord[1],
-                                                     SOURCE_CRS),
-                    textcoords='offset points', xytext=(5, 5),
+                    name, xy=(x, y), textcoords='offset points',
+                    xytext=(5, 5),
                     bbox=dict(boxstyle="round", fc="w", alpha=0.7))
 
 
-def header_dict(line):
+def header_dict(line, this_year=None):
     '''Convert a header line from an IGC logger file into a dictionary entry'''
-    headkey_dict = dict(zip(HEADER_FLAGS, HEADER_KEYS))
-    headkey = headkey_dict.get(line[0:5])
+    headkey = HEADKEY_DICT.get(line[0:5])
     if not headkey:
         return {}
     elif headkey == 'date':
+        if this_year is None:
+            this_year = datetime.date.today().year
         year = 2000 + int(line[9:11])
-        if year > datetime.date.today().year:
+        if year > this_year:
             year = year-100
         month = int(line[7:9])
         day = int(line[5:7])
         return {headkey: datetime.date(year, month, day)}
     else:
-        tup = line.split(':')
-        if len(tup) != 2:
+        _, sep, headval = line.partition(':')
+        if not sep:
             raise UserWarning("Invalid key=value data: %s" % line)
-        headval = tup[1].strip()
+        headval = headval.strip()
         if len(headval) > 0:
             return {headkey: headval}
         else:
@@ -156,34 +315,49 @@ def header_dict(line):
 
 def read_headers(ifp):
     '''
-    Read header fields from an open IGC logger file, and store information in a
-    dictionary
+    Read header fields from an IGC logger file open in binary mode, and store
+    information in a dictionary.  Only the header lines are decoded.  Returns
+    the dictionary and the first line after the headers, as raw bytes, which
+    has been consumed from the file.
     '''
     headers = {}
-    while True:
-        line = ifp.readline()
-        if line.startswith('H'):
-            headers.update(header_dict(line))
-            head_last = ifp.tell()
-        elif len(headers) == 0:
-            pass
-        else:
-            ifp.seek(head_last)
-            if headers.get('reg'):
-                headers.setdefault('compno', headers['reg'][-3:])
-            return headers
+    this_year = datetime.date.today().year
+    for line in ifp:
+        if line.startswith(b'H'):
+            headers.update(header_dict(line.decode('utf-8', 'replace'),
+                                       this_year))
+        elif len(headers):
+            break
+    else:
+        line = b''
+    if headers.get('reg'):
+        headers.setdefault('compno', headers['reg'][-3:])
+    return headers, line
+
+
+def iter_igc(dirpath):
+    '''
+    Yield the IGC logger files in a directory, whatever the case of their
+    extension, as a single directory scan finds them.
+    '''
+    with os.scandir(dirpath) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith('.igc') and entry.is_file():
+                yield entry.path
 
 
 def write_header_records(logger_filelist, record_file, append=False):
     '''
-    Read the headers from a list of IGC files and write them into a text file
-    in csv format.
+    Read the headers from an iterable of IGC files and write them into a text
+    file in csv format as each is read.  Returns the records written, as
+    read_header_records would read them, or the existing records if the file
+    is not overwritten.
     '''
     if os.path.isfile(record_file) and not append:
         while True:
             decide = input(record_file+' exists.  Overwrite? (y/n)')
             if decide == 'n':
-                return
+                return read_header_records(record_file)
             elif decide == 'y':
                 break
 
@@ -191,19 +365,37 @@ def write_header_records(logger_filelist, record_file, append=False):
         f = open(record_file, 'a')
     else:
         f = open(record_file, 'w')
+    record_header_keys = ['logger_file']+HEADER_KEYS
+    records = []
     for logfile in logger_filelist:
         print(logfile)
-        headers = read_headers(open(logfile))
+        with open(logfile, 'rb') as ifp:
+            headers, _ = read_headers(ifp)
         if headers.get('pilot'):
-            pilot_str = headers['pilot'].replace('.', ' ').replace('_', ' ')
-            headers['pilot'] = pilot_str
-            if headers['pilot'].isupper() or headers['pilot'].islower():
-                headers['pilot'] = headers['pilot'].title()
+            pilot = PILOT_SEPARATORS.sub(' ', headers['pilot'])
+            if pilot == pilot.upper() or pilot == pilot.lower():
+                pilot = pilot.title()
+            headers['pilot'] = pilot
         record = [logfile]
         for head in HEADER_KEYS:
             record.append(str(headers.get(head, '')))
-        f.write(', '.join(record)+'\n')
+        line = ', '.join(record)+'\n'
+        f.write(line)
+        records.append(dict(zip(record_header_keys, line.split(', '))))
     f.close()
+    return records
+
+
+def edit_header_records(record_file, records):
+    '''
+    Open a header records file in the user's editor.  Returns the given
+    records if the file is unchanged, otherwise re-reads them from the file.
+    '''
+    mtime = os.stat(record_file).st_mtime_ns
+    subprocess.run([os.getenv('EDITOR', 'gedit'), record_file], check=True)
+    if os.stat(record_file).st_mtime_ns == mtime:
+        return records
+    return read_header_records(record_file)
 
 
 def read_header_records(record_file):
@@ -216,6 +408,94 @@ def read_header_records(record_file):
     return records
 
 
+def decode_field(records, start, stop):
+    '''
+    Decode a fixed-width integer field, which may have a leading minus sign,
+    from each row of a 2D array of ASCII codes.
+    '''
+    digits = records[:, start:stop].astype(int) - ord('0')
+    negative = records[:, start] == ord('-')
+    digits[negative, 0] = 0
+    value = digits @ 10 ** np.arange(stop - start - 1, -1, -1)
+    return np.where(negative, -value, value)
+
+
+def read_int(data, start, stop):
+    '''
+    Decode a fixed-width integer, which may have a leading minus sign, from a
+    1D array of ASCII codes.
+    '''
+    value = 0
+    for i in range(start, stop):
+        if data[i] != 45:  # '-'
+            value = value * 10 + int(data[i]) - 48  # '0'
+    if data[start] == 45:
+        value = -value
+    return value
+
+
+def decode_b_records(data, starts):
+    '''
+    Decode the B records starting at each offset in a 1D array of ASCII codes.
+    Loop form of the field decoding in parse_b_records, for compiling with
+    numba.
+    '''
+    n = len(starts)
+    times = np.empty(n, dtype=np.int64)
+    lat = np.empty(n)
+    lon = np.empty(n)
+    alt = np.empty(n)
+    gpsalt = np.empty(n)
+    for i in range(n):
+        o = starts[i]
+        times[i] = (read_int(data, o+1, o+3) * 3600 +
+                    read_int(data, o+3, o+5) * 60 + read_int(data, o+5, o+7))
+        lat[i] = read_int(data, o+7, o+9) + read_int(data, o+9, o+14)/60000.
+        if data[o+14] == 83:  # 'S'
+            lat[i] = -lat[i]
+        lon[i] = read_int(data, o+15, o+18) + read_int(data, o+18, o+23)/60000.
+        if data[o+23] == 87:  # 'W'
+            lon[i] = -lon[i]
+        alt[i] = read_int(data, o+25, o+30)
+        gpsalt[i] = read_int(data, o+30, o+35)
+    return times, lat, lon, alt, gpsalt
+
+
+if njit is not None:
+    read_int = njit(cache=True, nogil=True)(read_int)
+    decode_b_records = njit(cache=True, nogil=True)(decode_b_records)
+
+
+def parse_b_records(data):
+    '''
+    Decode all B records in a 1D array of ASCII codes read from an IGC logger
+    file.  Returns arrays of times (seconds since midnight), latitudes,
+    longitudes, pressure altitudes and GPS altitudes.
+    '''
+    starts = np.concatenate([[0], np.flatnonzero(data == ord('\n')) + 1])
+    starts = starts[starts + B_RECORD_LENGTH <= len(data)]
+    starts = starts[data[starts] == ord('B')]
+
+    if not (np.isin(data[starts + 14], [ord('N'), ord('S')]).all() and
+            np.isin(data[starts + 23], [ord('E'), ord('W')]).all()):
+        raise UserWarning("Invalid latlon format")
+
+    if njit is not None:
+        return decode_b_records(data, starts)
+
+    records = data[starts[:, np.newaxis] + np.arange(B_RECORD_LENGTH)]
+    times = (decode_field(records, 1, 3) * 3600 +
+             decode_field(records, 3, 5) * 60 + decode_field(records, 5, 7))
+    lat = decode_field(records, 7, 9) + decode_field(records, 9, 14)/60000.
+    lat = np.where(records[:, 14] == ord('S'), -lat, lat)
+    lon = decode_field(records, 15, 18) + decode_field(records, 18, 23)/60000.
+    lon = np.where(records[:, 23] == ord('W'), -lon, lon)
+    alt = decode_field(records, 25, 30).astype(float)
+    gpsalt = decode_field(records, 30, 35).astype(float)
+
+    return times, lat, lon, alt, gpsalt
+
+
 class GliderFlight(object):
     '''
     Class to hold information about a glider flight: a trace, a (possibly
@@ -224,8 +504,6 @@ class GliderFlight(object):
     '''
     def __init__(self, filename, barrels=False, skip_declaration=False):
         self.trace = Trace()
-        lat = []
-        lon = []
         tp_names = []
         tp_lat = []
         tp_lon = []
@@ -239,17 +517,27 @@ class GliderFlight(object):
             else:
                 raise UserWarning("Invalid latlon format")
 
-        with open(filename) as ifp:
-            self.headers = read_headers(ifp)
-            for line in ifp:
-                if line.startswith('B'):
-                    self.trace.times.append(datetime.time(
-                        int(line[1:3]), int(line[3:5]), int(line[5:7])))
-                    lat.append(fixtofloat(line[7:15]))
-                    lon.append(fixtofloat(line[15:24]))
-                    self.trace.alt.append(float(line[25:30])*METRETOFOOT)
-                    self.trace.gpsalt.append(float(line[30:35])*METRETOFOOT)
-                elif line.startswith('C') and skip_declaration is False:
+        # The records are parsed as raw bytes, so stray characters in them do
+        # no harm.
+        with open(filename, 'rb') as ifp:
+            self.headers, line = read_headers(ifp)
+            body = line + ifp.read()
+
+        times, lat, lon, alt, gpsalt = parse_b_records(
+            np.frombuffer(body, dtype=np.uint8))
+        self.trace.times = times
+        if self.headers.get('date'):
+            day = mdates.date2num(self.headers['date'])
+        else:
+            day = 0.0  # Only the time of day matters for plotting.
+        self.trace.mpl_dates = day + times / 86400.
+        self.trace.alt = alt * METRETOFOOT
+        self.trace.gpsalt = gpsalt * METRETOFOOT
+
+        if skip_declaration is False:
+            for raw in body.splitlines(True):
+                if raw.startswith(b'C'):
+                    line = raw.decode('ascii', 'replace')
                     if not declared:
                         declared = True
                         # First C line is declaration date. Skip.
@@ -258,40 +546,116 @@ class GliderFlight(object):
                         tp_lon.append(fixtofloat(line[9:18]))
                         tp_names.append(line[18:-2])
 
-        self.trace.latlon = sgeom.LineString(zip(lon, lat))
+        self.trace.lon = lon
+        self.trace.lat = lat
         if declared:
             self.task = Task(tp_names[1:-1], zip(tp_lon[1:-1], tp_lat[1:-1]))
         else:
             self.task = Task()
 
 
+@functools.lru_cache(maxsize=1)
+def turnpoint_index():
+    '''
+    Read the BGA turnpoint file into a dictionary with the longitude and
+    latitude of every turnpoint, keyed by trigraph.  A pickled copy is kept in
+    TURNPOINT_CACHE and reused while the turnpoint file is unchanged.
+    '''
+    cache_key = (os.path.abspath(TURNPOINT_FILE),
+                 os.stat(TURNPOINT_FILE).st_mtime)
+    try:
+        with open(TURNPOINT_CACHE, 'rb') as ifp:
+            key, latlon = pickle.load(ifp)
+        if key == cache_key:
+            return latlon
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+
+    # Records are 13 lines long.  Line 1 is the trigraph and line 9 the
+    # position, in the fixed-width form "57 04.213N 002 47.239W".
+    with open(TURNPOINT_FILE) as ifp:
+        lines = ifp.read().split('\n')
+    records = np.array(lines[:len(lines) // 13 * 13]).reshape(-1, 13)
+    names = np.char.strip(records[:, 1])
+    coords = np.frombuffer(records[:, 9].astype('S22').tobytes(),
+                           dtype=np.uint8).reshape(-1, 22)
+
+    lat = decode_field(coords, 0, 2) + (
+        decode_field(coords, 3, 5) + decode_field(coords, 6, 9)/1000.)/60.
+    lat = np.where(coords[:, 9] == ord('S'), -lat, lat)
+    lon = decode_field(coords, 11, 14) + (
+        decode_field(coords, 15, 17) + decode_field(coords, 18, 21)/1000.)/60.
+    lon = np.where(coords[:, 21] == ord('W'), -lon, lon)
+    latlon = dict(zip(names.tolist(), zip(lon.tolist(), lat.tolist())))
+
+    try:
+        os.makedirs(os.path.dirname(TURNPOINT_CACHE), exist_ok=True)
+        with open(TURNPOINT_CACHE, 'wb') as ofp:
+            pickle.dump((cache_key, latlon), ofp)
+    except OSError:
+        pass
+    return latlon
+
+
+def read_flights(filenames, **kwargs):
+    '''
+    Read a list of IGC logger files into GliderFlight instances, parsing the
+    files in parallel processes.  Any kwargs are passed to GliderFlight.
+
+    Scripts calling this must guard their main code with
+    ``if __name__ == '__main__':``, as worker processes may import them.
+    '''
+    filenames = list(filenames)
+    if not filenames:
+        return []
+    parse = functools.partial(GliderFlight, **kwargs)
+    workers = min(len(filenames), os.cpu_count() or 1)
+    try:
+        pickle.dumps(parse)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # Open files and locks raise TypeError, local functions AttributeError.
+        pool = ThreadPoolExecutor
+    else:
+        pool = ProcessPoolExecutor
+    try:
+        with pool(workers) as executor:
+            return list(executor.map(parse, filenames))
+    except BrokenProcessPool:
+        # No worker processes.  Threads still overlap file reading and the
+        # GIL-free numba decoding.
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(parse, filenames))
+
+
 def locate_turnpoints(turnpoint_list):
     '''
     Takes a list of BGA turnpoint trigraphs and returns a dictionary
     with the longitude and latitude of each turnpoint in list
     '''
-    latlon = {}
-    ntp = len(set(turnpoint_list))
-    with open(TURNPOINT_FILE) as ifp:
-        while True:
-            record = list(islice(ifp, 13))
-            if not record:
-                break
-            if record[1].strip() in turnpoint_list:
-                lat = float(record[9][0:2]) + float(record[9][3:9])/60.
-                if record[9][21] == 'S':
-                    lat = -lat
-                lon = float(record[9][11:14]) + float(record[9][15:21])/60.
-                if record[9][21] == 'W':
-                    lon = -lon
-                latlon.update({record[1].strip(): (lon, lat)})
-                if len(latlon) == ntp:
-                    break
-    return latlon
+    index = turnpoint_index()
+    return {name: index[name] for name in set(turnpoint_list)
+            if name in index}
+
+
+def map_pixel_size(ax):
+    '''
+    Get the length on the ground, in metres, of one pixel at the centre of a
+    map as it will be saved, at the figure's current size.
+    '''
+    fig = ax.figure
+    dpi = matplotlib.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = fig.dpi
+    ax.apply_aspect()
+    bbox = ax.get_window_extent()
+    x, y = bbox.x0 + bbox.width / 2.0, bbox.y0 + bbox.height / 2.0
+    ends = ax.transData.inverted().transform([(x, y), (x + fig.dpi / dpi, y)])
+    points = GEOM_CRS.transform_points(ax.projection, ends[:, 0], ends[:, 1])
+    return np.hypot(*(points[1, :2] - points[0, :2]))
 
 
 def plotmap(flights, zoom=10, tracecolors=['black'], taskcolors=['Crimson'],
-            aspectratio=None, terrain=False):
+            aspectratio=None, terrain=False, native=False):
     '''
     Plot one or more GliderFlight instances on a map.
 
@@ -304,6 +668,9 @@ def plotmap(flights, zoom=10, tracecolors=['black'], taskcolors=['Crimson'],
     * aspectratio: float specifying aspect ration of map as width/height
     * terrain: boolean.  False to plot OpenStreetMap map, True to plot Google
       terrain
+    * native: boolean.  If True, draw the map in longitude and latitude, with
+      the aspect set for the map's central latitude, so that traces and
+      turnpoints need no reprojection.  Only the map image is reprojected.
     '''
 
     if type(flights) is not list:
@@ -319,20 +686,32 @@ def plotmap(flights, zoom=10, tracecolors=['black'], taskcolors=['Crimson'],
     while len(tracecolors) < len(flights):
         tracecolors += tracecolors
 
-    if terrain:
-        tiler = GoogleTiles(style='terrain')
-    else:
-        tiler = MapboxTiles(mapboxkey, 'pirates')
+    tiler = get_tiler(terrain)
 
-    target_crs = tiler.crs
+    if native:
+        target_crs = SOURCE_CRS
+    else:
+        target_crs = tiler.crs
     ax = plt.axes(projection=target_crs)
 
-    for flight, color1, color2 in zip(flights, taskcolors, tracecolors):
+    # All traces go into one LineCollection, drawn as a single artist.  They
+    # are projected up front in one pyproj call each, so cartopy has no
+    # geometry to reproject at draw time.
+    transformer = get_transformer(SOURCE_CRS, target_crs)
+    traces = []
+    for flight, color1 in zip(flights, taskcolors):
         if type(flight) is str:
             flight = GliderFlight(flight)
         if color1:
             flight.task.addtomap(ax, color1)
-        flight.trace.addtomap(ax, color2)
+        traces.append(flight.trace)
+    # Rasterized, so vector output holds one image rather than every vertex.
+    collection = mcollections.LineCollection(
+        [np.column_stack(transformer.transform(trace.lon, trace.lat))
+         for trace in traces],
+        colors=tracecolors[:len(traces)], rasterized=True)
+    ax.add_collection(collection)
+    ax.autoscale_view()
 
     (minx, maxx, miny, maxy) = ax.get_extent(target_crs)
 
@@ -343,22 +722,40 @@ def plotmap(flights, zoom=10, tracecolors=['black'], taskcolors=['Crimson'],
     miny = miny - (maxy - miny) * buffer_size
     maxy = maxy + (maxy - miny) * buffer_size
 
+    # Length on the map of a degree of longitude relative to one of latitude.
+    if native:
+        xscale = np.cos(np.deg2rad((miny + maxy) / 2.0))
+    else:
+        xscale = 1.0
+
     if aspectratio:
 
-        oldratio = (maxx-minx)/(maxy-miny)
+        oldratio = (maxx-minx)*xscale/(maxy-miny)
         if oldratio < aspectratio:
-            newmaxx = (aspectratio * (maxy-miny) + maxx + minx) / 2.0
-            newminx = (maxx + minx - aspectratio * (maxy - miny)) / 2.0
+            newmaxx = (aspectratio * (maxy-miny) / xscale + maxx + minx) / 2.0
+            newminx = (maxx + minx - aspectratio * (maxy-miny) / xscale) / 2.0
             newmaxy = maxy
             newminy = miny
         else:
-            newmaxy = ((maxx-minx)/aspectratio + maxy + miny) / 2.0
-            newminy = (maxy + miny - (maxx - minx) / aspectratio) / 2.0
+            newmaxy = ((maxx-minx)*xscale/aspectratio + maxy + miny) / 2.0
+            newminy = (maxy + miny - (maxx-minx)*xscale / aspectratio) / 2.0
             newmaxx = maxx
             newminx = minx
         ax.set_extent([newminx, newmaxx, newminy, newmaxy], crs=target_crs)
 
-    ax.add_image(tiler, zoom, alpha=0.8, interpolation='spline36')
+    if native:
+        ax.set_aspect(1 / xscale)
+
+    # Now the extent is final, drop detail too fine to see.  Half a pixel
+    # leaves room for the figure to be enlarged before it is saved.
+    tolerance = map_pixel_size(ax) / 2.0
+    collection.set_segments(
+        [np.column_stack(transformer.transform(*trace.map_points(tolerance)))
+         for trace in traces])
+
+    # The image's imshow call would otherwise reset the aspect.
+    ax.add_image(tiler, zoom, alpha=0.8, interpolation='spline36',
+                 aspect=ax.get_aspect())
     print(ax.get_images())
 
     if isinstance(tiler, MapboxTiles):
@@ -383,14 +780,12 @@ def plotaltitude(flights, ax, colors=['black']):
 
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
     for flight, color in zip(flights, colors):
-        x = [datetime.datetime.combine(flight.headers.get('date'), t) for t in
-             flight.trace.times]
         if max(flight.trace.alt):
             print('plotting real')
-            ax.plot(x, flight.trace.alt, color=color)
+            ax.plot(flight.trace.mpl_dates, flight.trace.alt, color=color)
         else:
             print('plotting gps')
-            ax.plot(x, flight.trace.gpsalt, color=color)
+            ax.plot(flight.trace.mpl_dates, flight.trace.gpsalt, color=color)
     ax.grid(True)
     ax.set_ylabel('Altitude (feet)')
     ax.set_xlabel('Time (GMT)')
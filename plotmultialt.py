@@ -5,80 +5,74 @@
 from glidertrace import *
 import argparse
 import os
-import glob
 import matplotlib.pyplot as plt
 import numpy as np
 
-# Get command line arguments
-parser = argparse.ArgumentParser(
-    description='Plot altitudes of all traces in a directory')
-parser.add_argument(
-    'directory', help='A directory containing one or more IGC logger files')
-parser.add_argument('title', help='A title for the plot')
-parser.add_argument(
-    '--imagefile', '-f', default=None,
-    help=('File to write A4 landscape plot into.  If not set, opens Matplotlib'
-          ' display.'))
+if __name__ == '__main__':
+    # Get command line arguments
+    parser = argparse.ArgumentParser(
+        description='Plot altitudes of all traces in a directory')
+    parser.add_argument(
+        'directory',
+        help='A directory containing one or more IGC logger files')
+    parser.add_argument('title', help='A title for the plot')
+    parser.add_argument(
+        '--imagefile', '-f', default=None,
+        help=('File to write A4 landscape plot into.  If not set, opens '
+              'Matplotlib display.'))
 
-args = parser.parse_args()
-lgdir = args.directory+'/'
-recordfile = lgdir+'records.txt'
+    args = parser.parse_args()
+    lgdir = args.directory+'/'
+    recordfile = lgdir+'records.txt'
 
-files = glob.glob(lgdir+'*.igc') + glob.glob(lgdir+'*.IGC')
+    files = iter_igc(lgdir)
 
-# Get logger header records
-if os.path.isfile(recordfile):
-    records = read_header_records(recordfile)
-    files_new = list(set(files) - set([record.get('logger_file') for
-                     record in records]))
-    if len(files_new) > 0:
-        write_header_records(files_new, recordfile, append=True)
-        editor = os.getenv('EDITOR', 'gedit')
-        x = os.spawnlp(os.P_WAIT, editor, editor, recordfile)
+    # Get logger header records
+    if os.path.isfile(recordfile):
         records = read_header_records(recordfile)
-else:
-    write_header_records(files, recordfile)
-    editor = os.getenv('EDITOR', 'gedit')
-    x = os.spawnlp(os.P_WAIT, editor, editor, recordfile)
-    records = read_header_records(recordfile)
+        have = {record['logger_file']: record for record in records}
+        files_new = (lgfile for lgfile in files if lgfile not in have)
+        records_new = write_header_records(files_new, recordfile,
+                                           append=True)
+        if records_new:
+            records += records_new
+            records = edit_header_records(recordfile, records)
+    else:
+        records = edit_header_records(
+            recordfile, write_header_records(files, recordfile))
 
-files = [record.get('logger_file') for record in records]
-labels = ['{} {}'.format(record.get('pilot'), record.get('compno')) for
-          record in records]
-labels, files = zip(*sorted(zip(labels, files)))  # alphabetize
+    files = [record.get('logger_file') for record in records]
+    labels = ['{} {}'.format(record.get('pilot'), record.get('compno')) for
+              record in records]
+    order = sorted(range(len(labels)), key=labels.__getitem__)  # alphabetize
+    labels = [labels[i] for i in order]
+    files = [files[i] for i in order]
 
+    # Choose colours
+    cmap = plt.get_cmap('gist_rainbow_r')
+    colors = list(cmap(np.linspace(0.0, 1.0, len(labels))))
 
-# Choose colours
-colors = []
-cmap = plt.get_cmap('gist_rainbow_r')
-for i, pilot in enumerate(labels):
-    colors.append(cmap(float(i)/(len(labels)-1)))
+    # Read traces from files
+    flights = read_flights(files, skip_declaration=True)
 
+    # Plot traces
+    ax1 = plt.gca()
+    plotaltitude(flights, ax1, colors=colors)
 
-# Read traces from files
-flights = []
-for lgfile in files:
-    flight = GliderFlight(lgfile, skip_declaration=True)
-    flights.append(flight)
+    # Add title and legend
+    ax1.set_title(args.title, fontsize='large')
+    if len(labels) >= 12:
+        ncol = 3
+    else:
+        ncol = 2
+    leg = ax1.legend(labels, ncol=ncol, loc=4, fontsize='small')
+    for legobj in leg.legendHandles:
+        legobj.set_linewidth(2.0)
 
-# Plot traces
-ax1 = plt.gca()
-plotaltitude(flights, ax1, colors=colors)
-
-# Add title and legend
-ax1.set_title(args.title, fontsize='large')
-if len(labels) >= 12:
-    ncol = 3
-else:
-    ncol = 2
-leg = ax1.legend(labels, ncol=ncol, loc=4, fontsize='small')
-for legobj in leg.legendHandles:
-    legobj.set_linewidth(2.0)
-
-if args.imagefile is not None:
-    fig = plt.gcf()
-    fig.tight_layout()
-    fig.set_size_inches((11.7, 8.3))
-    plt.savefig(args.imagefile)
-else:
-    plt.show()
+    if args.imagefile is not None:
+        fig = plt.gcf()
+        fig.tight_layout()
+        fig.set_size_inches((11.7, 8.3))
+        plt.savefig(args.imagefile)
+    else:
+        plt.show()
@@ -2,102 +2,120 @@
 """Command line interface to plot multiple traces with glidertrace.py"""
 
 import argparse
+import gc
 import os
-import glob
-
-import matplotlib.pyplot as plt
-import numpy as np
-import cartopy.crs as ccrs
-
-import glidertrace
-
-# Get command line arguments
-parser = argparse.ArgumentParser(description='Plot all traces in a directory')
-parser.add_argument('directory',
-                    help='A directory containing one or more IGC logger files')
-parser.add_argument('title', help='A title for the map')
-parser.add_argument('--imagefile', '-f', default=None,
-                    help=('File to write A4 landscape map into.  If not set, '
-                          'opens Matplotlib display.'))
-parser.add_argument('--turnpointlist', '-t', nargs='+',
-                    help='List of BGA trigraphs for annotation')
-parser.add_argument('--zoom', '-z', type=int, default=10,
-                    help=('Map detail level.  Use 10 for large tasks, 12 for '
-                          'local tasks'))
-
-args = parser.parse_args()
-lgdir = args.directory+'/'
-recordfile = lgdir+'records.txt'
-
-files = glob.glob(lgdir+'*.igc') + glob.glob(lgdir+'*.IGC')
-
-# Get logger header records
-if os.path.isfile(recordfile):
-    records = glidertrace.read_header_records(recordfile)
-    files_new = list(set(files) -
-                     set([record.get('logger_file') for record in records]))
-    if len(files_new) > 0:
-        glidertrace.write_header_records(files_new, recordfile, append=True)
-        editor = os.getenv('EDITOR', 'gedit')
-        x = os.spawnlp(os.P_WAIT, editor, editor, recordfile)
+from operator import itemgetter
+
+if __name__ == '__main__':
+    # Get command line arguments
+    parser = argparse.ArgumentParser(
+        description='Plot all traces in a directory')
+    parser.add_argument(
+        'directory',
+        help='A directory containing one or more IGC logger files')
+    parser.add_argument('title', help='A title for the map')
+    parser.add_argument('--imagefile', '-f', default=None,
+                        help=('File to write A4 landscape map into.  If not '
+                              'set, opens Matplotlib display.'))
+    parser.add_argument('--turnpointlist', '-t', nargs='+',
+                        help='List of BGA trigraphs for annotation')
+    parser.add_argument('--zoom', '-z', type=int, default=10,
+                        help=('Map detail level.  Use 10 for large tasks, 12 '
+                              'for local tasks'))
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.directory):
+        parser.error('{} is not a directory'.format(args.directory))
+
+    # Plotting libraries are slow to import, so only load them once the
+    # arguments are known to be good.
+    import matplotlib
+    if args.imagefile is not None:
+        # Writing straight to file needs no GUI, so skip the interactive
+        # backend.  This must happen before pyplot is imported.
+        matplotlib.use('Agg')
+    matplotlib.rcParams['path.simplify'] = True
+    matplotlib.rcParams['path.simplify_threshold'] = 1.0
+
+    import matplotlib.lines as mlines
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    import glidertrace
+
+    # Share glidertrace's CRS instance so its cached Transformer is reused.
+    SOURCE_CRS = glidertrace.SOURCE_CRS
+    RAINBOW = plt.get_cmap('gist_rainbow_r')
+
+    lgdir = args.directory+'/'
+    recordfile = lgdir+'records.txt'
+
+    files = glidertrace.iter_igc(lgdir)
+
+    # Get logger header records
+    if os.path.isfile(recordfile):
         records = glidertrace.read_header_records(recordfile)
-else:
-    glidertrace.write_header_records(files, recordfile)
-    editor = os.getenv('EDITOR', 'gedit')
-    x = os.spawnlp(os.P_WAIT, editor, editor, recordfile)
-    records = glidertrace.read_header_records(recordfile)
-
-files = [record.get('logger_file') for record in records]
-labels = ['{} {}'.format(record.get('pilot'), record.get('compno')) for
-          record in records]
-labels, files = zip(*sorted(zip(labels, files)))  # alphabetize
-
-
-# Choose colours
-if len(labels) > 3:
-    colors = []
-    cmap = plt.get_cmap('gist_rainbow_r')
-    for i, pilot in enumerate(labels):
-        colors.append(cmap(float(i) / (len(labels) - 1)))
-else:
-    colors = ['magenta', 'blue', 'red']
-
-
-# Read traces from files
-flights = []
-for lgfile in files:
-    flight = glidertrace.GliderFlight(lgfile, skip_declaration=True)
-    flights.append(flight)
-
-# Plot traces
-ax1 = glidertrace.plotmap(flights, zoom=args.zoom, tracecolors=colors,
-                          aspectratio=11.7/8.3)
-
-# Plot turnpoints if given
-if args.turnpointlist:
-    dummy = glidertrace.Task(args.turnpointlist)
-    source_crs = ccrs.PlateCarree()
-    target_crs = ax1.projection
-    for name, coord in dummy.latlon.items():
-        ax1.annotate(
-            name,
-            xy=target_crs.transform_point(coord[0], coord[1], source_crs),
-            bbox=dict(boxstyle="round", fc="w"), fontsize='small')
-
-# Add title and legend
-ax1.set_title(args.title, fontsize='large')
-if len(labels) >= 12:
-    ncol = 3
-else:
-    ncol = 2
-leg = ax1.legend(labels, ncol=ncol, loc=4)
-for legobj in leg.legendHandles:
-    legobj.set_linewidth(2.0)
-
-if args.imagefile is not None:
-    fig = plt.gcf()
-    fig.tight_layout()
-    fig.set_size_inches((11.7, 8.3))
-    plt.savefig(args.imagefile)
-else:
-    plt.show()
+        have = {record['logger_file']: record for record in records}
+        files_new = (lgfile for lgfile in files if lgfile not in have)
+        records_new = glidertrace.write_header_records(files_new, recordfile,
+                                                       append=True)
+        if records_new:
+            records += records_new
+            records = glidertrace.edit_header_records(recordfile, records)
+    else:
+        records = glidertrace.edit_header_records(
+            recordfile, glidertrace.write_header_records(files, recordfile))
+
+    files = list(map(itemgetter('logger_file'), records))
+    get_label = itemgetter('pilot', 'compno')
+    labels = [f'{pilot} {compno}' for (pilot, compno) in
+              map(get_label, records)]
+    order = sorted(range(len(labels)), key=labels.__getitem__)  # alphabetize
+    labels = [labels[i] for i in order]
+    files = [files[i] for i in order]
+
+    # Choose colours
+    if len(labels) > 3:
+        colors = list(RAINBOW(np.linspace(0.0, 1.0, len(labels))))
+    else:
+        colors = ['magenta', 'blue', 'red']
+
+    # Read traces from files
+    flights = glidertrace.read_flights(files, skip_declaration=True)
+
+    # Plot traces
+    ax1 = glidertrace.plotmap(flights, zoom=args.zoom, tracecolors=colors,
+                              aspectratio=11.7/8.3)
+    # The map holds its own projected copies of the traces, so release the
+    # parsed flights before rendering.
+    del flights
+    gc.collect()
+
+    # Plot turnpoints if given
+    if args.turnpointlist:
+        dummy = glidertrace.Task(args.turnpointlist)
+        lon, lat = dummy.lonlat()
+        xs, ys = glidertrace.get_transformer(
+            SOURCE_CRS, ax1.projection).transform(lon, lat)
+        for name, x, y in zip(dummy.latlon, xs, ys):
+            ax1.annotate(name, xy=(x, y), bbox=dict(boxstyle="round", fc="w"),
+                         fontsize='small')
+
+    # Add title and legend
+    ax1.set_title(args.title, fontsize='large')
+    if len(labels) >= 12:
+        ncol = 3
+    else:
+        ncol = 2
+    lines = [mlines.Line2D([], [], color=color, label=label, linewidth=2.0)
+             for (color, label) in zip(colors, labels)]
+    ax1.legend(handles=lines, ncol=ncol, loc=4)
+
+    if args.imagefile is not None:
+        # Fixed A4 margins, so savefig needs no tight layout pass.
+        fig = plt.gcf()
+        fig.set_size_inches((11.7, 8.3))
+        fig.subplots_adjust(left=0.02, right=0.98, bottom=0.02, top=0.95)
+        plt.savefig(args.imagefile)
+    else:
+        plt.show()